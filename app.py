@@ -2,6 +2,8 @@ import streamlit as st
 from mcq_generator import AdvancedMCQGenerator
 from short_answer_generator import QuestionGenerator
 from truefalse_quiz import generate_true_false
+from t5_generator import T5Generator, SPEED_MODES
+from incremental_cache import IncrementalCache
 import io
 
 # Set page config at the top
@@ -19,6 +21,28 @@ question_type = col1.selectbox("Question Type", ["Multiple Choice", "Short Answe
 difficulty = col2.selectbox("Difficulty", ["easy", "medium", "hard"])
 
 num_questions = st.slider("🔢 Number of Questions", min_value=1, max_value=10, value=3)
+
+# Fine-tuned FLAN-T5 is used for the Short Answer and True/False paths
+col3, col4 = st.columns(2)
+use_t5 = col3.checkbox("Use fine-tuned FLAN-T5", value=False)
+speed_mode = col4.selectbox("T5 Speed Mode", list(SPEED_MODES), disabled=not use_t5)
+
+# Incremental mode keeps the models loaded and reuses items whose sentences were not edited
+incremental = st.checkbox("♻️ Incremental regeneration (reuse questions from unchanged sentences)", value=False)
+if "quiz_cache" not in st.session_state:
+    st.session_state.quiz_cache = IncrementalCache()
+
+@st.cache_resource
+def load_t5_generator():
+    return T5Generator()
+
+@st.cache_resource
+def load_mcq_generator():
+    return AdvancedMCQGenerator()
+
+@st.cache_resource
+def load_short_answer_generator():
+    return QuestionGenerator()
 #<<<<<<< main
 #=======
 
@@ -32,11 +56,18 @@ if st.button("⚡ Generate Quiz"):
         with st.spinner("Generating quiz..."):
             output = io.StringIO()  # For optional export
             questions = []
+            t5_generator = None
+            cache = st.session_state.quiz_cache if incremental else None
+            if use_t5 and question_type != "Multiple Choice":
+                t5_generator = load_t5_generator()
+                t5_generator.reset_stats()
+                if not t5_generator.fine_tuned:
+                    st.warning(f"Fine-tuned FLAN-T5 weights not found (set QUIZCRAFT_T5_MODEL); using {t5_generator.model_name}.")
 
             if question_type == "Multiple Choice":
-                generator = AdvancedMCQGenerator()
+                generator = load_mcq_generator() if incremental else AdvancedMCQGenerator()
                 try:
-                    questions = generator.generate_mcq(context, num_questions=num_questions, difficulty=difficulty)
+                    questions = generator.generate_mcq(context, num_questions=num_questions, difficulty=difficulty, cache=cache)
                     st.subheader("📘 Multiple Choice Questions")
                     for idx, q in enumerate(questions, 1):
                         st.markdown(f"**Q{idx}: {q['question']}**")
@@ -54,8 +85,8 @@ if st.button("⚡ Generate Quiz"):
 
             elif question_type == "Short Answer":
                 try:
-                    generator = QuestionGenerator()
-                    questions = generator.generate_questions(context, num_questions=num_questions, difficulty=difficulty)
+                    generator = load_short_answer_generator() if incremental else QuestionGenerator()
+                    questions = generator.generate_questions(context, num_questions=num_questions, difficulty=difficulty, cache=cache, speed_mode=speed_mode, t5_generator=t5_generator)
                     st.subheader("📝 Short Answer Questions")
                     for idx, q in enumerate(questions, 1):
                         st.markdown(f"**Q{idx}: {q['question']}**")
@@ -70,9 +101,9 @@ if st.button("⚡ Generate Quiz"):
             elif question_type == "True/False":
                 try:
                     st.subheader("✅ True/False Questions")
-                    tf_generator = generate_true_false()  # Initialize the class
+                    tf_generator = generate_true_false(t5_generator=t5_generator)  # Initialize the class
                     sentences = tf_generator.validate_inputs(context, num_questions, difficulty)
-                    questions = tf_generator.generate_statements(context, num_questions, difficulty, sentences)
+                    questions = tf_generator.generate_statements(context, num_questions, difficulty, sentences, cache=cache, speed_mode=speed_mode)
                     
                     for idx, (statement, label) in enumerate(questions, 1):
                         st.markdown(f"**Q{idx}: {statement}**")
@@ -85,6 +116,13 @@ if st.button("⚡ Generate Quiz"):
                     st.error(f"❌ Failed to generate true/false questions: {str(e)}")
 
 
+            if cache is not None and questions:
+                st.caption(f"♻️ Reused {cache.stats['reused']} item(s), recomputed {cache.stats['recomputed']}.")
+
+            if t5_generator is not None and t5_generator.last_stats["prompts"]:
+                stats = t5_generator.last_stats
+                st.caption(f"{t5_generator.model_name} ({speed_mode}): {stats['prompts']} prompts, {stats['tokens']} tokens in {stats['seconds']:.2f}s ({stats['tokens_per_sec']:.1f} tokens/sec)")
+
             # Download button if questions were generated
             if questions:
                 st.download_button("⬇️ Download Quiz as PDF", output.getvalue(), file_name="quizcraft_quiz.pdf")
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import torch
+
+# Where tuned configurations are stored, keyed by "<model>@<cores>/<workers>"
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "quizcraft", "autotune.json")
+# Bumped when the scoring changes so stale configurations are re-tuned instead of applied
+CONFIG_VERSION = 3
+
+# QUIZCRAFT_AUTOTUNE=1 tunes untuned models at startup, "force" re-tunes everything
+AUTOTUNE_ENV = "QUIZCRAFT_AUTOTUNE"
+# How many inference workers (app processes, or sessions running at once) share this process's cores
+WORKERS_ENV = "QUIZCRAFT_WORKERS"
+
+# Used until a model has been tuned on this host
+DEFAULT_CONFIG = {"intra_op_threads": None, "inter_op_threads": None, "batch_size": 8}
+
+# Small workload shared by the benchmarks
+SAMPLE_CONTEXT = ("The Sun is the star at the center of the Solar System. There are eight planets orbiting it. "
+                  "Jupiter is the largest planet, and Mars is the fourth planet from the Sun. "
+                  "Pluto was reclassified as a dwarf planet in 2006 by the International Astronomical Union.")
+SAMPLE_SENTENCES = [
+    "The Sun is the star at the center of the Solar System.",
+    "There are eight planets orbiting the Sun.",
+    "Jupiter is the largest planet.",
+    "Mars is the fourth planet from the Sun.",
+    "Pluto was reclassified as a dwarf planet in 2006.",
+    "Water boils at 100 degrees Celsius at sea level.",
+    "The Moon orbits the Earth roughly every 27 days.",
+    "Light from the Sun takes about eight minutes to reach the Earth.",
+]
+
+
+class InferenceAutotuner:
+    def __init__(self, config_path=CONFIG_PATH, cores=None, workers=None):
+        """
+        Benchmark thread and batch-size settings per model and remember the fastest
+        """
+        self.config_path = config_path
+        self.cores = cores or available_cores()
+        self.workers = workers or configured_workers()
+        self.configs = self._load()
+        self.tuned = set()  # models benchmarked by this process
+
+    def _load(self):
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CONFIG_VERSION:
+            return {}
+        return data.get("models", {})
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CONFIG_VERSION, "models": self.configs}, f, indent=2)
+
+    def key(self, model_name):
+        return f"{model_name}@{self.cores}/{self.workers}"
+
+    def max_threads(self):
+        """Intra-op threads one worker may use without oversubscribing the cores"""
+        return max(1, self.cores // self.workers)
+
+    def process_threads(self):
+        """
+        The one intra-op thread count this process runs every model with: the largest any tuned
+        model on this host wants, or the per-worker share when none is tuned
+        """
+        tuned = [config["intra_op_threads"] for key, config in self.configs.items()
+                 if key.endswith(f"@{self.cores}/{self.workers}") and config.get("intra_op_threads")]
+        return min(max(tuned), self.max_threads()) if tuned else self.max_threads()
+
+    def candidate_configs(self, batch_sizes=(1, 4, 8, 16)):
+        """
+        Thread/batch combinations one worker can apply: intra-op threads from its share of the
+        cores down to one, halving each step
+        """
+        intra = self.max_threads()
+        while intra >= 1:
+            for batch_size in batch_sizes:
+                yield {"intra_op_threads": intra, "inter_op_threads": 1, "batch_size": batch_size}
+            intra //= 2
+
+    def benchmark(self, model_name, run_batch, samples, batch_sizes=(1, 4, 8, 16), repeats=3, batches=2):
+        """
+        Time run_batch(samples, batch_size) under every candidate configuration, store and return the best.
+        Samples are repeated until the largest batch size fills `batches` batches, and each
+        configuration keeps the best of `repeats` runs so one noisy run does not decide.
+        """
+        needed = max(batch_sizes) * batches
+        samples = (list(samples) * (needed // len(samples) + 1))[:max(needed, len(samples))]
+        best = None
+        threads = None
+        for config in self.candidate_configs(batch_sizes):
+            if config["intra_op_threads"] != threads:
+                threads = config["intra_op_threads"]
+                torch.set_num_threads(threads)
+                # Warm up at every thread count so pool start-up is not measured
+                run_batch(samples[:max(batch_sizes)], max(batch_sizes))
+            elapsed = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run_batch(samples, config["batch_size"])
+                run_time = time.perf_counter() - start
+                elapsed = run_time if elapsed is None else min(elapsed, run_time)
+            throughput = len(samples) / elapsed if elapsed > 0 else 0.0
+            if best is None or throughput > best["throughput"]:
+                best = dict(config, throughput=throughput)
+        self.configs[self.key(model_name)] = best
+        self.tuned.add(model_name)
+        self._save()
+        apply_threads(self.process_threads())
+        return best
+
+    def configure(self, model_name, run_batch=None, samples=None):
+        """
+        Return the stored configuration for model_name on this host, benchmarking first when
+        QUIZCRAFT_AUTOTUNE asks for it. Only its batch size is per model; threads are set per process.
+        """
+        mode = os.environ.get(AUTOTUNE_ENV, "").lower()
+        config = self.configs.get(self.key(model_name))
+        retune = (mode == "force" and model_name not in self.tuned) or (mode in ("1", "true", "yes") and config is None)
+        if run_batch is not None and samples and retune:
+            config = self.benchmark(model_name, run_batch, samples)
+        return config or DEFAULT_CONFIG
+
+
+def available_cores():
+    """Cores this process may run on; respects CPU affinity set by taskset, containers or a process manager"""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def configured_workers():
+    """Number of concurrent inference workers from QUIZCRAFT_WORKERS (default 1)"""
+    try:
+        return max(1, int(os.environ.get(WORKERS_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def apply_threads(intra_op_threads):
+    """
+    Set torch's thread pools for the whole process. torch's thread count is global, so this is done
+    once at start-up (and after tuning) rather than per call, where concurrent sessions would race on it.
+    """
+    if torch.get_num_interop_threads() != 1:
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # torch only accepts this before the first parallel work in the process
+    if torch.get_num_threads() != intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+
+
+_autotuner = None
+
+def configure(model_name, run_batch=None, samples=None):
+    """Module-level shortcut sharing one InferenceAutotuner per process"""
+    global _autotuner
+    if _autotuner is None:
+        _autotuner = InferenceAutotuner()
+        apply_threads(_autotuner.process_threads())
+    return _autotuner.configure(model_name, run_batch, samples)
+
+
+def main():
+    # Tune every model the app uses; importing the generators runs their benchmarks
+    os.environ[AUTOTUNE_ENV] = "force"
+    tuner = InferenceAutotuner()
+    print(f"Tuning inference on {tuner.cores} cores for {tuner.workers} worker(s)...")
+    import quiz_logic  # noqa: F401  (NLI model)
+    import truefalse_quiz  # noqa: F401  (NLI model)
+    from mcq_generator import AdvancedMCQGenerator
+    from short_answer_generator import QuestionGenerator
+    from t5_generator import T5Generator
+    AdvancedMCQGenerator()
+    QuestionGenerator()
+    T5Generator()
+    tuner = InferenceAutotuner()
+    for key, config in tuner.configs.items():
+        if not key.endswith(f"@{tuner.cores}/{tuner.workers}"):
+            continue
+        print(f"{key}: {config['intra_op_threads']} threads, "
+              f"batch size {config['batch_size']} ({config['throughput']:.1f} items/sec)")
+    print(f"Each app process will run with {tuner.process_threads()} threads")
+
+if __name__ == "__main__":
+    main()
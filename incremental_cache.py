@@ -0,0 +1,75 @@
+import difflib
+
+
+class IncrementalCache:
+    def __init__(self):
+        """
+        Remember generated quiz items between runs so an edited context only recomputes
+        the items whose supporting sentences changed
+        """
+        self.sentences = []
+        self.unchanged = set()
+        self.changed = []
+        self.memo = {}    # (namespace, key) -> (value, support)
+        self.items = {}   # namespace -> [(item, support)] from the previous run
+        self.stats = {"reused": 0, "recomputed": 0}
+        self._taken = {}
+
+    def update(self, sentences):
+        """
+        Diff the new sentences against the previous context and drop every result that
+        depends on an edited or removed sentence. Returns the new/edited sentences.
+        """
+        sentences = [s.strip() for s in sentences]
+        self.stats = {"reused": 0, "recomputed": 0}
+        self._taken = {}
+        if sentences == self.sentences:
+            self.changed = []
+            return []
+        matcher = difflib.SequenceMatcher(a=self.sentences, b=sentences, autojunk=False)
+        unchanged = set()
+        changed = []
+        for tag, _, _, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                unchanged.update(sentences[j1:j2])
+            else:
+                changed.extend(sentences[j1:j2])
+
+        self.sentences = sentences
+        self.unchanged = unchanged
+        self.changed = changed
+        self.memo = {k: v for k, v in self.memo.items() if v[1] <= unchanged}
+        self.items = {ns: [(item, support) for item, support in items if support <= unchanged]
+                      for ns, items in self.items.items()}
+        return changed
+
+    def support_for(self, text):
+        """Sentences of the current context that contain `text`; the whole context if none do"""
+        found = frozenset(s for s in self.sentences if text and text.lower() in s.lower())
+        return found or frozenset(self.sentences)
+
+    # Per-call memo for model outputs (QA answers, NLI verdicts, T5 generations)
+    def get(self, namespace, key):
+        entry = self.memo.get((namespace, key))
+        if entry is None:
+            return None
+        self.stats["reused"] += 1
+        return entry[0]
+
+    def put(self, namespace, key, value, support):
+        self.memo[(namespace, key)] = (value, frozenset(support))
+        self.stats["recomputed"] += 1
+        return value
+
+    # Whole quiz items from the previous run
+    def previous(self, namespace, limit=None):
+        """Still-valid (item, support) pairs from the last run of `namespace`"""
+        items = self.items.get(namespace, [])[:limit]
+        self.stats["reused"] += len(items)
+        self._taken[namespace] = len(items)
+        return items
+
+    def record(self, namespace, items_with_support):
+        items_with_support = [(item, frozenset(support)) for item, support in items_with_support]
+        self.stats["recomputed"] += max(0, len(items_with_support) - self._taken.pop(namespace, 0))
+        self.items[namespace] = items_with_support
@@ -4,6 +4,7 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
 from transformers import pipeline
+import autotune
 
 class AdvancedMCQGenerator:
     def __init__(self):
@@ -14,6 +15,13 @@ class AdvancedMCQGenerator:
         self.qa_pipeline = pipeline("question-answering")
         self.stop_words = set(stopwords.words('english'))
 
+        # Batch size tuned for this host (see autotune.py); thread counts are set once per process
+        self.qa_config = autotune.configure(f"question-answering:{self.qa_pipeline.model.name_or_path}", self._run_qa, autotune.SAMPLE_SENTENCES)
+
+    def _run_qa(self, sentences, batch_size):
+        questions = [f"What is the primary significance of {s}?" for s in sentences]
+        return self.qa_pipeline(question=questions, context=[autotune.SAMPLE_CONTEXT] * len(questions), batch_size=batch_size)
+
     def extract_key_concepts(self, context):
         """Extract key concepts and important phrases"""
         # Tokenize sentences
@@ -59,6 +67,10 @@ class AdvancedMCQGenerator:
 
     def generate_contextual_distractors(self, correct_answer, context, difficulty):
         """Create semantically related but incorrect distractors"""
+        return [phrase for phrase, _ in self.pick_distractors(correct_answer, context, difficulty)]
+
+    def pick_distractors(self, correct_answer, context, difficulty):
+        """Return (distractor, source sentence) pairs; fallback distractors have no source"""
         sentences = sent_tokenize(context)
         distractors = []
         potential_distractors = [sent for sent in sentences if correct_answer.lower() not in sent.lower() and len(sent.split()) > 3]
@@ -75,30 +87,63 @@ class AdvancedMCQGenerator:
                     phrase = ' '.join([w for w in words if w.lower() not in self.stop_words][:5])
                 else:  # medium
                     phrase = ' '.join([w for w in words if w.lower() not in self.stop_words][:3])
-                distractors.append(phrase.strip())
+                distractors.append((phrase.strip(), distractor))
             else:
-                distractors.append(random.choice(fallback_distractors))
+                distractors.append((random.choice(fallback_distractors), None))
         return distractors
 
-    def generate_mcq(self, context, num_questions=3, difficulty='medium'):
-        """Generate Multiple Choice Questions"""
+    def generate_mcq(self, context, num_questions=3, difficulty='medium', cache=None):
+        """Generate Multiple Choice Questions. With an IncrementalCache, questions whose
+        concept, answer and distractor sentences are unchanged are reused."""
         # Validate context
         if not context or len(context.split()) < 30:
             raise ValueError("Context is too short. Provide more detailed text.")
         
         mcq_questions = []
         key_concepts = self.extract_key_concepts(context)
+        if cache is not None:
+            cache.update(sent_tokenize(context))
         
-        for concept in key_concepts[:num_questions]:
+        concepts = key_concepts[:num_questions]
+        cached = {}
+        if cache is not None:
+            for concept in concepts:
+                hit = cache.get(("mcq", difficulty), concept)
+                if hit is not None:
+                    cached[concept] = hit
+
+        # Answer every new question in one QA batch
+        pending = [concept for concept in concepts if concept not in cached]
+        questions = {concept: self.generate_intelligent_question(concept, context, difficulty) for concept in pending}
+        answers = {}
+        if pending:
+            try:
+                results = self.qa_pipeline(question=[questions[c] for c in pending], context=[context] * len(pending), batch_size=self.qa_config["batch_size"])
+                if isinstance(results, dict):
+                    results = [results]
+                answers = dict(zip(pending, results))
+            except Exception as e:
+                print(f"Error generating question: {e}")
+
+        for concept in concepts:
+            if concept in cached:
+                mcq_questions.append(cached[concept])
+                continue
+            if concept not in answers:
+                continue
             try:
-                question = self.generate_intelligent_question(concept, context, difficulty)
-                answer_result = self.qa_pipeline(question=question, context=context)
-                correct_answer = answer_result['answer']
-                distractors = self.generate_contextual_distractors(correct_answer, context, difficulty)
+                question = questions[concept]
+                correct_answer = answers[concept]['answer']
+                picked = self.pick_distractors(correct_answer, context, difficulty)
+                distractors = [phrase for phrase, _ in picked]
                 all_options = [correct_answer] + distractors
                 random.shuffle(all_options)
                 correct_index = all_options.index(correct_answer)  # Determine correct option index
-                mcq_questions.append({"question": question,"options": all_options,"correct_answer": correct_index})     # Create MCQ
+                mcq = {"question": question,"options": all_options,"correct_answer": correct_index}     # Create MCQ
+                if cache is not None:
+                    support = {concept.strip()} | cache.support_for(correct_answer) | {src.strip() for _, src in picked if src}
+                    cache.put(("mcq", difficulty), concept, mcq, support)
+                mcq_questions.append(mcq)
             except Exception as e:
                 print(f"Error generating question: {e}")
         return mcq_questions
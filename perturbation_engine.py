@@ -0,0 +1,293 @@
+import re
+import random
+from collections import namedtuple
+
+# Candidate statement produced by the engine. `edits` holds
+# (start, end, original, replacement, kind) tuples relative to the source sentence.
+Candidate = namedtuple("Candidate", ["statement", "label", "edits", "source"])
+
+# Result of PerturbationEngine.scan: per-sentence edit sites, the entities found (ordered dict)
+# and those entities indexed by shape, (word count, follows "the"), for like-for-like swaps
+Scan = namedtuple("Scan", ["sites", "entities", "by_shape"])
+
+# === SUBSTITUTION TABLES ===
+NEGATIONS = {
+    "is not": "is", "are not": "are", "was not": "was", "were not": "were",
+    "isn't": "is", "aren't": "are", "wasn't": "was", "weren't": "were",
+    "cannot": "can", "can't": "can", "does not": "does", "do not": "do", "did not": "did",
+    "doesn't": "does", "don't": "do", "didn't": "did", "will not": "will", "won't": "will",
+    "has not": "has", "have not": "have", "hasn't": "has", "haven't": "have",
+    "never": "always", "always": "never",
+    "is": "is not", "are": "are not", "was": "was not", "were": "were not",
+    "can": "cannot", "will": "will not",
+}
+
+ANTONYM_PAIRS = [
+    ("largest", "smallest"), ("biggest", "smallest"), ("large", "small"), ("big", "small"),
+    ("hot", "cold"), ("hottest", "coldest"), ("high", "low"), ("highest", "lowest"),
+    ("first", "last"), ("before", "after"), ("more", "less"), ("most", "least"),
+    ("increase", "decrease"), ("increases", "decreases"), ("increased", "decreased"),
+    ("inner", "outer"), ("north", "south"), ("east", "west"), ("early", "late"),
+    ("fast", "slow"), ("fastest", "slowest"), ("long", "short"), ("longest", "shortest"),
+    ("strong", "weak"), ("ancient", "modern"), ("above", "below"),
+    ("positive", "negative"), ("natural", "artificial"), ("rich", "poor"), ("true", "false"),
+]
+ANTONYMS = {}
+for _a, _b in ANTONYM_PAIRS:
+    ANTONYMS.setdefault(_a, _b)
+    ANTONYMS.setdefault(_b, _a)
+
+NUMBER_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+                "eleven", "twelve", "fifteen", "twenty", "hundred", "thousand", "million", "billion"]
+
+# Capitalised words that only swap within their own list, never with other entities
+CALENDAR_WORDS = [
+    ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+     "October", "November", "December"],
+    ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+]
+CALENDAR = {word: words for words in CALENDAR_WORDS for word in words}
+
+# Tokens that already negate; a negation edit next to one would double it ("was not never")
+NEGATORS = {"not", "never", "no", "nor", "cannot", "none", "nothing", "nobody", "neither"}
+
+# Words that start with a capital letter but are never worth swapping as entities
+ENTITY_STOPWORDS = {"The", "A", "An", "This", "That", "These", "Those", "It", "Its", "I", "In", "On",
+                    "At", "By", "For", "From", "With", "As", "But", "And", "Or", "If", "When", "While",
+                    "He", "She", "They", "We", "You", "His", "Her", "Their", "Our", "Your",
+                    "There", "Here", "Then", "What", "Which", "Who", "Where", "Why", "How", "Some",
+                    "Many", "Most", "All", "Each", "Every", "After", "Before", "During", "Since",
+                    "Although", "However", "Also", "Today", "Such", "Because", "Only"}
+
+# Which perturbation kinds each difficulty draws from, easiest to spot first
+DIFFICULTY_KINDS = {
+    "easy": ("negation",),
+    "medium": ("negation", "antonym", "number"),
+    "hard": ("entity", "number", "antonym"),
+}
+
+
+def _alternation(words):
+    # Longest first so "is not" wins over "is"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+# One compiled automaton covering every perturbation kind; each match is a single edit site
+PERTURBATION_PATTERN = re.compile(
+    r"(?P<number>\b(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\b|\b(?:" + _alternation(NUMBER_WORDS) + r")\b)"
+    r"|(?P<negation>\b(?:" + _alternation(NEGATIONS) + r")\b)"
+    r"|(?P<antonym>\b(?:" + _alternation(ANTONYMS) + r")\b)"
+    r"|(?P<entity>\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b)"
+)
+
+
+def _match_case(original, replacement):
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class PerturbationEngine:
+    def __init__(self, seed=42):
+        self.rng = random.Random(seed)
+
+    def _classify(self, match):
+        """Return the (start, end, text, kind) edit sites of a match, splitting leading table words off entity spans"""
+        kind = match.lastgroup
+        start = match.start()
+        if kind != "entity":
+            return [(start, match.end(), match.group(), kind)]
+
+        # Capitalised table words (e.g. "Is", "North") belong to their table, and stopwords
+        # that merely start the span are dropped ("The Sun" -> "Sun", "Is Mars" -> "Is" + "Mars")
+        sites = []
+        words = match.group().split()
+        while words:
+            word = words[0]
+            lowered = word.lower()
+            # Capitalised antonym words are skipped (at a sentence start "Light" is usually a noun), as are
+            # negations that would add "not" after a capital: "Is Mars red?" must not become "Is not Mars red?"
+            negation = lowered in NEGATIONS and "not" not in NEGATIONS[lowered]
+            table_kind = "negation" if negation else "number" if lowered in NUMBER_WORDS else None
+            if table_kind:
+                sites.append((start, start + len(word), word, table_kind))
+            elif word not in ENTITY_STOPWORDS and lowered not in ANTONYMS:
+                break
+            words = words[1:]
+            start = match.string.find(words[0], start + len(word)) if words else start
+        if words:
+            text = match.string[start:match.end()]
+            sites.append((start, match.end(), text, "entity"))
+        return sites
+
+    def scan(self, sentences):
+        """
+        Scan all sentences in one pass and return the edit sites found in each one
+        """
+        sites = []
+        entities = {}
+        first_words = set()
+        sentence_initial = []  # entity sites whose capital may only come from starting the sentence
+        for sentence in sentences:
+            sentence_sites = []
+            offset = len(sentence) - len(sentence.lstrip())
+            for match in PERTURBATION_PATTERN.finditer(sentence):
+                for site in self._classify(match):
+                    if site[3] == "negation" and self._next_to_negator(sentence, site[0], site[1]):
+                        continue
+                    sentence_sites.append(site)
+                    if site[3] != "entity":
+                        continue
+                    if site[0] == offset:
+                        sentence_initial.append((sentence_sites, len(sentence_sites) - 1))
+                    else:
+                        entities.setdefault(site[2], self._follows_the(sentence, site[0]))
+                        first_words.add(site[2].split()[0])
+            sites.append(sentence_sites)
+
+        # A sentence-initial word only counts as an entity if it is capitalised elsewhere too
+        # ("Scientists believe..." is not, "Mars is red. Rovers explore Mars." is)
+        for sentence_sites, index in sentence_initial:
+            start, end, text, kind = sentence_sites[index]
+            first, _, rest = text.partition(" ")
+            if first in first_words:
+                entities.setdefault(text, False)
+            elif rest:
+                sentence_sites[index] = (end - len(rest), end, rest, kind)
+                entities.setdefault(rest, False)
+            else:
+                sentence_sites[index] = None
+        for i, sentence_sites in enumerate(sites):
+            if None in sentence_sites:
+                sites[i] = [site for site in sentence_sites if site is not None]
+
+        by_shape = {}
+        for entity, follows_the in entities.items():
+            if entity not in CALENDAR:
+                by_shape.setdefault((len(entity.split()), follows_the), []).append(entity)
+        return Scan(sites, entities, by_shape)
+
+    @staticmethod
+    def _follows_the(sentence, start):
+        return re.search(r"\bthe\s*$", sentence[:start], re.I) is not None
+
+    @staticmethod
+    def _next_to_negator(sentence, start, end):
+        """True when the word just before or after sentence[start:end] already negates"""
+        before = re.search(r"([\w']+)\W*$", sentence[:start])
+        after = re.match(r"\W*([\w']+)", sentence[end:])
+        for word in (before, after):
+            if word and (word.group(1).lower() in NEGATORS or word.group(1).lower().endswith("n't")):
+                return True
+        return False
+
+    def _replacement(self, text, kind, scanned, sentence=""):
+        if kind == "negation":
+            return _match_case(text, NEGATIONS[text.lower()])
+        if kind == "antonym":
+            return _match_case(text, ANTONYMS[text.lower()])
+        if kind == "number":
+            if text.lower() in NUMBER_WORDS:
+                choices = [w for w in NUMBER_WORDS if w != text.lower()]
+                return _match_case(text, self.rng.choice(choices))
+            value = float(text.replace(",", ""))
+            shifted = value + self.rng.choice([-1, 1]) * max(1, round(abs(value) * self.rng.uniform(0.2, 0.5)))
+            if shifted < 0:
+                shifted = value + 1
+            # Keep the original's thousands separators and decimal places
+            separator = "," if "," in text else ""
+            decimals = len(text.partition(".")[2])
+            return f"{shifted:{separator}.{decimals}f}"
+        if kind == "entity" and text in CALENDAR:
+            return self.rng.choice([w for w in CALENDAR[text] if w != text])
+        if kind == "entity":
+            # Only swap for an entity of the same shape so "Mars" swaps with "Venus", not "Solar System".
+            # A few random draws keep this constant-time however many entities the context has.
+            bucket = scanned.by_shape.get((len(text.split()), scanned.entities.get(text, False)), [])
+            for _ in range(min(8, len(bucket))):
+                other = self.rng.choice(bucket)
+                if other not in text and text not in other and other not in sentence:
+                    return other
+        return None
+
+    def _contradiction(self, sentence, site, scanned):
+        """Apply one edit site to a sentence, or return None when it has no usable replacement"""
+        start, end, text, kind = site
+        replacement = self._replacement(text, kind, scanned, sentence)
+        if not replacement or replacement == text:
+            return None
+        clean = sentence.strip()
+        offset = sentence.find(clean)
+        s, e = start - offset, end - offset
+        statement = clean[:s] + replacement + clean[e:]
+        return Candidate(statement, "CONTRADICTION", [(s, e, text, replacement, kind)], sentence)
+
+    def candidates(self, sentences, kinds=None, scanned=None):
+        """
+        Build (statement, label) candidates for every sentence: the untouched sentence as
+        ENTAILMENT plus one CONTRADICTION per applicable edit site
+        """
+        scanned = scanned or self.scan(sentences)
+        result = []
+        for sentence, sentence_sites in zip(sentences, scanned.sites):
+            result.append(Candidate(sentence.strip(), "ENTAILMENT", [], sentence))
+            for site in sentence_sites:
+                if kinds is not None and site[3] not in kinds:
+                    continue
+                candidate = self._contradiction(sentence, site, scanned)
+                if candidate:
+                    result.append(candidate)
+        return result
+
+    def perturb(self, sentence, level):
+        """Return a single perturbed version of `sentence`, or the sentence itself"""
+        for candidate in self.candidates([sentence], DIFFICULTY_KINDS.get(level, ())):
+            if candidate.label == "CONTRADICTION":
+                return candidate.statement
+        return sentence.strip()
+
+    def false_count(self, n):
+        """How many of n statements should be CONTRADICTION; odd counts round either way"""
+        return n // 2 + n % 2 * self.rng.randint(0, 1)
+
+    def generate(self, sentences, n, difficulty, num_false=None, scanned=None, allowed=None):
+        """
+        Pick n statements from distinct sentences, balanced between ENTAILMENT and CONTRADICTION
+        unless num_false asks for a specific split. `scanned` reuses a scan of `sentences`;
+        `allowed` restricts which sentences may be picked as sources.
+        """
+        kinds = DIFFICULTY_KINDS.get(difficulty, DIFFICULTY_KINDS["medium"])
+        scanned = scanned or self.scan(sentences)
+        order = [i for i, sentence in enumerate(sentences) if allowed is None or sentence in allowed]
+        self.rng.shuffle(order)
+        if num_false is None:
+            num_false = self.false_count(n)
+
+        # Sources are chosen first and replacements are only built for the sites actually used.
+        # The difficulty's kinds are tried before falling back to any kind.
+        final = []
+        used = set()
+        for preferred in (True, False):
+            for i in order:
+                if len(final) >= num_false:
+                    break
+                if i in used:
+                    continue
+                for site in scanned.sites[i]:
+                    if (site[3] in kinds) != preferred:
+                        continue
+                    candidate = self._contradiction(sentences[i], site, scanned)
+                    if candidate:
+                        final.append(candidate)
+                        used.add(i)
+                        break
+        for i in order:
+            if len(final) >= n:
+                break
+            if i not in used:
+                final.append(Candidate(sentences[i].strip(), "ENTAILMENT", [], sentences[i]))
+                used.add(i)
+        self.rng.shuffle(final)
+        return final[:n]
@@ -1,8 +1,9 @@
 # quiz_logic.py
-import random
 import nltk
 from transformers import pipeline
 from nltk.tokenize import sent_tokenize
+from perturbation_engine import PerturbationEngine
+import autotune
 
 # Download required tokenizer
 nltk.download('punkt', quiet=True)
@@ -10,6 +11,12 @@ nltk.download('punkt', quiet=True)
 # Load NLI model
 nli = pipeline("text-classification", model="facebook/bart-large-mnli")
 
+# Batch size tuned for this host (see autotune.py); thread counts are set once per process
+def _run_nli(statements, batch_size):
+    return nli([f"{autotune.SAMPLE_CONTEXT} [SEP] {s}" for s in statements], batch_size=batch_size)
+
+nli_config = autotune.configure("facebook/bart-large-mnli", _run_nli, autotune.SAMPLE_SENTENCES)
+
 def validate_inputs(context, num_questions, difficulty):
     if not context.strip():
         return False, "Context cannot be empty."
@@ -21,32 +28,41 @@ def validate_inputs(context, num_questions, difficulty):
     return True, sentences
 
 def apply_noise(sentence: str, level: str) -> str:
-    if level == "easy":
-        return sentence
-    elif level == "medium":
-        if "Sun" in sentence:
-            return sentence.replace("Sun", "Moon")
-        return sentence.replace("is", "is not") if "is" in sentence else sentence
-    elif level == "hard":
-        if "eight" in sentence:
-            return sentence.replace("eight", "ten")
-        return sentence.replace("planets", "stars") if "planets" in sentence else sentence
-    return sentence
+    return PerturbationEngine().perturb(sentence, level)
 
 def generate_statements(context, n, difficulty, sentences):
-    random.seed(42)
-    selected = random.sample(sentences, min(n * 2, len(sentences)))
+    engine = PerturbationEngine(seed=42)
     final = []
-    for s in selected:
-        clean = s.strip()
-        modified = apply_noise(clean, difficulty)
-        label = "ENTAILMENT" if clean == modified else "CONTRADICTION"
-        final.append({"statement": modified, "actual_label": label})
-        if len(final) >= n:
-            break
+    for c in engine.generate(sentences, n, difficulty):
+        final.append({"statement": c.statement, "actual_label": c.label, "edits": c.edits, "source": c.source})
     return final
 
-def score_answers(context, answers):
+def score_answers(context, answers, cache=None):
+    # With an IncrementalCache, NLI verdicts are reused while the statement's source sentence is unchanged
+    if cache is not None:
+        cache.update(sent_tokenize(context))
+
+    # Collect NLI verdicts first so every uncached statement goes through the model in one batch
+    verdicts = {}
+    pending = []
+    for answer in answers:
+        statement = answer.get('statement')
+        if answer.get('user_answer', '').strip().lower() not in ['true', 'false'] or statement in verdicts:
+            continue
+        cached = cache.get("nli", statement) if cache is not None else None
+        if cached is not None:
+            verdicts[statement] = cached
+        elif all(a.get('statement') != statement for a in pending):
+            pending.append(answer)
+    if pending:
+        outputs = nli([f"{context} [SEP] {a.get('statement')}" for a in pending], batch_size=nli_config["batch_size"])
+        for answer, result in zip(pending, outputs):
+            verdicts[answer.get('statement')] = result
+            if cache is not None:
+                source = answer.get('source')
+                support = {source.strip()} if source else cache.sentences
+                cache.put("nli", answer.get('statement'), result, support)
+
     score = 0
     results = []
     for answer in answers:
@@ -58,8 +74,7 @@ def score_answers(context, answers):
                 "result": "Invalid answer. Please use 'true' or 'false'."
             })
             continue
-        input_text = f"{context} [SEP] {statement}"
-        result = nli(input_text)[0]
+        result = verdicts[statement]
         if result["label"] == "neutral":
             results.append({
                 "statement": statement,
@@ -97,13 +97,18 @@ if __name__ == "__main__":
     main()
 import torch
 import random
+import nltk
+from nltk.tokenize import sent_tokenize
 from transformers import pipeline, AutoModelForQuestionAnswering, AutoTokenizer
+import autotune
 
 class QuestionGenerator:
-    def __init__(self, model_name='distilbert-base-uncased-distilled-squad'):
+    def __init__(self, model_name='distilbert-base-uncased-distilled-squad', t5_generator=None):
         """
-        Initialize question generation system using a stable QA model
+        Initialize question generation system using a stable QA model.
+        When a T5Generator is given, questions come from it instead of the templates.
         """
+        self.t5_generator = t5_generator
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.model = AutoModelForQuestionAnswering.from_pretrained(model_name)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -116,6 +121,9 @@ class QuestionGenerator:
             device=0 if self.device == 'cuda' else -1
         )
 
+        # Batch size tuned for this host (see autotune.py); thread counts are set once per process
+        self.qa_config = autotune.configure(f"question-answering:{model_name}", self._run_qa, autotune.SAMPLE_SENTENCES)
+
         # Sample templates to simulate natural QA generation
         self.question_templates = [
             "What is the main idea of",
@@ -130,27 +138,76 @@ class QuestionGenerator:
             "Describe the process of"
         ]
 
-    def generate_questions(self, context, num_questions=3, difficulty='medium'):
+    def _run_qa(self, sentences, batch_size):
+        questions = [f"What is the main idea of {s}?" for s in sentences]
+        return self.qa_pipeline(question=questions, context=[autotune.SAMPLE_CONTEXT] * len(questions), batch_size=batch_size)
+
+    def generate_questions(self, context, num_questions=3, difficulty='medium', cache=None, speed_mode=None, t5_generator=None):
         """
-        Generate short answer questions based on provided context
+        Generate short answer questions based on provided context.
+        With an IncrementalCache, questions whose answer sentences are unchanged are reused
+        and new ones are drawn from the edited sentences first.
+        A t5_generator passed here is used for this call only, overriding the one given at init.
         """
+        t5_generator = t5_generator or self.t5_generator
         generated_questions = []
+        changed = []
+        if cache is not None:
+            nltk.download('punkt_tab', quiet=True)
+            changed = cache.update(sent_tokenize(context))
+            namespace = ("short", difficulty, t5_generator is not None)
+            generated_questions = [q for q, _ in cache.previous(namespace, num_questions)]
+
+        if t5_generator is not None:
+            generated_questions = self.generate_t5_questions(context, num_questions, generated_questions, changed, speed_mode, t5_generator)
+        else:
+            generated_questions = self.generate_template_questions(context, num_questions, generated_questions, changed)
+
+        if cache is not None:
+            # A question depends on the sentence(s) it was asked about as well as the ones holding its answer
+            cache.record(namespace, [(q, set(q['sources']) | cache.support_for(q['answer'])) for q in generated_questions])
+        return generated_questions
+
+    def generate_template_questions(self, context, num_questions=3, generated_questions=None, preferred_sentences=()):
+        """
+        Fill up to num_questions by asking template questions about random snippets of the context
+        """
+        generated_questions = list(generated_questions or [])
         attempts = 0
         max_attempts = num_questions * 10
+        nltk.download('punkt_tab', quiet=True)
+        # Each word keeps the sentence it came from so a question knows which sentences it was asked about
+        context_words = [(word, s) for s in sent_tokenize(context) for word in s.split()]
+        preferred = [(word, s) for s in preferred_sentences for word in s.split()]
 
         while len(generated_questions) < num_questions and attempts < max_attempts:
-            try:
+            # Ask a round of questions in one QA batch, never more than the remaining attempts
+            round_size = min(self.qa_config["batch_size"], max_attempts - attempts)
+            full_questions = []
+            sources = []
+            for i in range(round_size):
                 template = random.choice(self.question_templates)
-                words = context.split()
+                # Spend the first half of the attempts on the preferred (edited) sentences
+                words = preferred if preferred and attempts + i < max_attempts // 2 else context_words
                 start_index = random.randint(0, max(0, len(words) - 5))
-                snippet = ' '.join(words[start_index:start_index + 5])
-                full_question = f"{template} {snippet}?"
+                snippet = words[start_index:start_index + 5]
+                full_questions.append(f"{template} {' '.join(word for word, _ in snippet)}?")
+                sources.append(tuple(dict.fromkeys(s for _, s in snippet)))
+            attempts += round_size
 
-                result = self.qa_pipeline(question=full_question, context=context)
+            try:
+                results = self.qa_pipeline(question=full_questions, context=[context] * len(full_questions), batch_size=self.qa_config["batch_size"])
+                if isinstance(results, dict):
+                    results = [results]
+            except Exception as e:
+                print(f"Question generation error: {e}")
+                continue
 
+            for full_question, source, result in zip(full_questions, sources, results):
                 # Validate and deduplicate
                 if (
-                    result['answer']
+                    len(generated_questions) < num_questions
+                    and result['answer']
                     and len(result['answer']) > 3
                     and result['score'] > 0.5
                     and not any(q['answer'].lower() == result['answer'].lower() for q in generated_questions)
@@ -158,14 +215,50 @@ class QuestionGenerator:
                     generated_questions.append({
                         'question': full_question,
                         'answer': result['answer'],
-                        'confidence': result['score']
+                        'confidence': result['score'],
+                        'sources': source
                     })
-                attempts += 1
 
-            except Exception as e:
-                print(f"Question generation error: {e}")
-                attempts += 1
+        return generated_questions
 
+    def generate_t5_questions(self, context, num_questions=3, generated_questions=None, preferred_sentences=(), speed_mode=None, t5_generator=None):
+        """
+        Generate questions for a batch of sentences with the T5 model, then answer them in one QA batch
+        """
+        generated_questions = list(generated_questions or [])
+        needed = num_questions - len(generated_questions)
+        if needed <= 0:
+            return generated_questions[:num_questions]
+        nltk.download('punkt_tab', quiet=True)
+        sentences = sent_tokenize(context)
+        # Edited sentences first, then a random sample of the rest
+        selected = [s for s in preferred_sentences if s in sentences][:needed * 2]
+        others = [s for s in sentences if s not in selected]
+        selected += random.sample(others, min(needed * 2 - len(selected), len(others)))
+        if not selected:
+            return generated_questions
+        questions = (t5_generator or self.t5_generator).questions(selected, speed_mode)
+        results = self.qa_pipeline(question=questions, context=[context] * len(questions), batch_size=self.qa_config["batch_size"])
+        if isinstance(results, dict):
+            results = [results]
+
+        for question, sentence, result in zip(questions, selected, results):
+            # Validate and deduplicate
+            if (
+                question
+                and result['answer']
+                and len(result['answer']) > 3
+                and result['score'] > 0.5
+                and not any(q['answer'].lower() == result['answer'].lower() for q in generated_questions)
+            ):
+                generated_questions.append({
+                    'question': question,
+                    'answer': result['answer'],
+                    'confidence': result['score'],
+                    'sources': (sentence,)
+                })
+            if len(generated_questions) >= num_questions:
+                break
         return generated_questions
 
     def display_questions(self, questions):
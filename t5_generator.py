@@ -0,0 +1,138 @@
+import os
+import re
+import time
+import threading
+import torch
+import nltk
+from nltk.tokenize import sent_tokenize
+from transformers import AutoTokenizer, T5ForConditionalGeneration
+import autotune
+
+# Generation settings per speed mode. All modes keep the decoder KV cache on.
+SPEED_MODES = {
+    "greedy": {"num_beams": 1, "do_sample": False, "max_new_tokens": 64},
+    "beam": {"num_beams": 3, "do_sample": False, "early_stopping": True, "max_new_tokens": 64},
+    "fast": {"num_beams": 1, "do_sample": False, "max_new_tokens": 32},  # stops at EOS or a short length cap
+}
+
+# Where the training notebook's output is expected; QUIZCRAFT_T5_MODEL overrides it
+DEFAULT_MODEL_PATH = os.environ.get("QUIZCRAFT_T5_MODEL", os.path.join("models", "flan_t5_finetuned"))
+FALLBACK_MODEL = "google/flan-t5-base"
+
+# The prompt and output format the FLAN-T5 model was fine-tuned on
+TRUE_FALSE_PROMPT = "Convert this fact into a true/false question: {}"
+TRUE_FALSE_SUFFIX = "True or False?"
+# Not part of the fine-tuning data: an instruction FLAN-T5 follows zero-shot for short-answer questions
+QUESTION_PROMPT = "generate question: {}"
+
+
+def _contains(text, span):
+    """Whether span occurs in text as whole words ("not" must not match "nothing")"""
+    return re.search(rf"\b{re.escape(span)}\b", text, re.I) is not None
+
+
+class T5Generator:
+    def __init__(self, model_name=DEFAULT_MODEL_PATH, fallback_model=FALLBACK_MODEL, speed_mode='greedy', batch_size=None):
+        """
+        Load the fine-tuned FLAN-T5 model for batched statement/question generation
+        """
+        # The fine-tuned weights are produced by the training notebook; fall back to the base model without them
+        self.fine_tuned = os.path.isdir(model_name)
+        if not self.fine_tuned:
+            model_name = fallback_model
+        self.model_name = model_name
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = T5ForConditionalGeneration.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+        if speed_mode not in SPEED_MODES:
+            raise ValueError(f"Speed mode must be one of {', '.join(SPEED_MODES)}.")
+        self.speed_mode = speed_mode
+        # Stats are kept per thread so concurrent app sessions sharing this instance do not mix them up
+        self._local = threading.local()
+
+        # Batch size tuned for this host (see autotune.py); an explicit batch_size wins
+        self.config = autotune.configure(f"t5:{model_name}", self._run_batch, autotune.SAMPLE_SENTENCES)
+        self.batch_size = batch_size or self.config["batch_size"]
+
+    @property
+    def last_stats(self):
+        return getattr(self._local, "stats", {"prompts": 0, "tokens": 0, "seconds": 0.0, "tokens_per_sec": 0.0})
+
+    def reset_stats(self):
+        self._local.stats = {"prompts": 0, "tokens": 0, "seconds": 0.0, "tokens_per_sec": 0.0}
+
+    def _run_batch(self, sentences, batch_size):
+        self.batch_size = batch_size
+        return self.questions(sentences)
+
+    def generate(self, prompts, speed_mode=None):
+        """
+        Run all prompts through the model in batches and return the decoded outputs
+        """
+        settings = SPEED_MODES[speed_mode or self.speed_mode]
+        # Batch prompts of similar length together so little time is spent on padding
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        outputs = [None] * len(prompts)
+        total_tokens = 0
+        start = time.perf_counter()
+        for i in range(0, len(order), self.batch_size):
+            indices = order[i:i + self.batch_size]
+            batch = [prompts[j] for j in indices]
+            # Pad to the longest prompt in the batch instead of a fixed max length
+            inputs = self.tokenizer(batch, padding="longest", truncation=True, max_length=256, return_tensors="pt").to(self.device)
+            with torch.inference_mode():
+                output_ids = self.model.generate(**inputs, use_cache=True, **settings)
+            # Count generated tokens, ignoring the decoder start token and padding
+            total_tokens += int((output_ids[:, 1:] != self.tokenizer.pad_token_id).sum())
+            for j, text in zip(indices, self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+                outputs[j] = text
+        elapsed = time.perf_counter() - start
+        self._local.stats = {
+            "prompts": len(prompts),
+            "tokens": total_tokens,
+            "seconds": elapsed,
+            "tokens_per_sec": total_tokens / elapsed if elapsed > 0 else 0.0,
+        }
+        return [o.strip() for o in outputs]
+
+    def true_false_questions(self, statements, required_spans=None, speed_mode=None, forbidden_spans=None):
+        """
+        Rephrase statements as true/false questions. An output is only kept if it still contains
+        every required span as whole words (e.g. the edit that makes a statement false) and none
+        of the forbidden ones (e.g. the text that edit replaced); otherwise the trained
+        "<statement> True or False?" format is used so the answer key stays correct.
+        """
+        generated = self.generate([TRUE_FALSE_PROMPT.format(s) for s in statements], speed_mode)
+        required_spans = required_spans or [[] for _ in statements]
+        forbidden_spans = forbidden_spans or [[] for _ in statements]
+        questions = []
+        for output, statement, spans, forbidden in zip(generated, statements, required_spans, forbidden_spans):
+            if (output and all(_contains(output, span) for span in spans)
+                    and not any(_contains(output, span) for span in forbidden)):
+                questions.append(output)
+            else:
+                questions.append(f"{statement} {TRUE_FALSE_SUFFIX}")
+        return questions
+
+    def questions(self, sentences, speed_mode=None):
+        """Generate one question per sentence"""
+        return self.generate([QUESTION_PROMPT.format(s) for s in sentences], speed_mode)
+
+
+def main():
+    generator = T5Generator()
+    context = input(">> Enter context text: ").strip()
+    speed_mode = input(f">> Speed mode ({' / '.join(SPEED_MODES)}): ").strip().lower() or 'greedy'
+    if speed_mode not in SPEED_MODES:
+        print("Invalid speed mode.")
+        return
+    nltk.download('punkt_tab', quiet=True)
+    sentences = sent_tokenize(context)
+    for idx, question in enumerate(generator.questions(sentences, speed_mode), 1):
+        print(f"Q{idx}: {question}")
+    stats = generator.last_stats
+    print(f"\n{stats['tokens']} tokens in {stats['seconds']:.2f}s ({stats['tokens_per_sec']:.1f} tokens/sec)")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
-import random
+import re
 import nltk
 from transformers import pipeline
 from nltk.tokenize import sent_tokenize
+from perturbation_engine import PerturbationEngine
+import autotune
 nltk.download('punkt_tab', quiet=True)
 # Load NLI model
 nli = pipeline("text-classification", model="facebook/bart-large-mnli")
 
+# Batch size tuned for this host (see autotune.py); thread counts are set once per process
+def _run_nli(statements, batch_size):
+    return nli([f"{autotune.SAMPLE_CONTEXT} [SEP] {s}" for s in statements], batch_size=batch_size)
+
+nli_config = autotune.configure("facebook/bart-large-mnli", _run_nli, autotune.SAMPLE_SENTENCES)
+
 class generate_true_false:
-    def __init__(self):
-        pass
+    def __init__(self, t5_generator=None):
+        self.engine = PerturbationEngine()
+        # Optional T5Generator used to rephrase statements as questions in one batch
+        self.t5_generator = t5_generator
     def validate_inputs(self, context, num_questions, difficulty):
         if not context.strip():
             raise ValueError("Context cannot be empty.")
@@ -16,31 +26,48 @@ class generate_true_false:
         return sentences
 
     def apply_noise(self, sentence: str, level: str) -> str:
-        if level == "easy":
-            return sentence
-        elif level == "medium":
-            if "Sun" in sentence:
-                return sentence.replace("Sun", "Moon")
-            return sentence.replace("is", "is not") if "is" in sentence else sentence
-        elif level == "hard":
-            if "eight" in sentence:
-                return sentence.replace("eight", "ten")
-            return sentence.replace("planets", "stars") if "planets" in sentence else sentence
-        return sentence
+        return self.engine.perturb(sentence, level)
+
+    # Statement generator: one scan over all sentences, balanced true/false picks.
+    # With an IncrementalCache, statements from unchanged sentences are reused and
+    # new ones come from the edited sentences first.
+    def generate_statements(self, context, n, difficulty, sentences, cache=None, speed_mode=None):
+        self.engine = PerturbationEngine(seed=42)
+        # The whole context is scanned once; the pools below only limit which sentences may be sources
+        scanned = self.engine.scan(sentences)
+        reused = []
+        pools = [None]
+        if cache is not None:
+            changed = set(cache.update(sentences))
+            namespace = ("tf", difficulty, self.t5_generator is not None)
+            reused = cache.previous(namespace, n)
+            used = set().union(*(support for _, support in reused))
+            remaining = [s for s in sentences if s.strip() not in used]
+            pools = [{s for s in remaining if s.strip() in changed}, {s for s in remaining if s.strip() not in changed}]
 
-    # Statement generator
-    def generate_statements(self, context, n, difficulty, sentences):
-        random.seed(42)
-        selected = random.sample(sentences, min(n * 2, len(sentences)))
-        final = []
-        for s in selected:
-            clean = s.strip()
-            modified = self.apply_noise(clean, difficulty)
-            label = "ENTAILMENT" if clean == modified else "CONTRADICTION"
-            final.append((modified, label))
-            if len(final) >= n:
-                break
-        return final
+        # Top up the reused items so the whole quiz keeps the engine's true/false balance
+        target_false = self.engine.false_count(n)
+        candidates = []
+        for pool in pools:
+            needed = n - len(reused) - len(candidates)
+            if needed > 0 and (pool is None or pool):
+                have_false = sum(label == "CONTRADICTION" for (_, label), _ in reused)
+                have_false += sum(c.label == "CONTRADICTION" for c in candidates)
+                num_false = min(needed, max(0, target_false - have_false))
+                candidates += self.engine.generate(sentences, needed, difficulty, num_false, scanned, allowed=pool)
+        statements = [c.statement for c in candidates]
+        if self.t5_generator is not None and statements:
+            # The rephrased question must keep the edit (or, for true statements, the whole statement)
+            # and must not bring back the text the edit replaced ("always" after "always" -> "never")
+            required_spans = [[e[3] for e in c.edits] or [c.statement.rstrip(".!?")] for c in candidates]
+            forbidden_spans = [[e[2] for e in c.edits if not re.search(rf"\b{re.escape(e[2])}\b", e[3], re.I)]
+                               for c in candidates]
+            statements = self.t5_generator.true_false_questions(statements, required_spans, speed_mode, forbidden_spans)
+        fresh = [((s, c.label), {c.source.strip()}) for s, c in zip(statements, candidates)]
+
+        if cache is not None:
+            cache.record(namespace, reused + fresh)
+        return [item for item, _ in reused + fresh]
 
     # Get valid user answer
     def get_user_answer(self):
@@ -56,16 +83,16 @@ class generate_true_false:
             sentences = self.validate_inputs(context, num_questions, difficulty)
             questions = self.generate_statements(context, num_questions, difficulty, sentences)
             
+            # Format input for facebook/bart-large-mnli and check every statement in one batch
+            verdicts = nli([f"{context} [SEP] {statement}" for statement, _ in questions], batch_size=nli_config["batch_size"]) if questions else []
+
             print("\n--- QUIZ STARTS ---\n")
             score = 0
             
-            for idx, (statement, actual_label) in enumerate(questions, 1):
+            for idx, ((statement, actual_label), result) in enumerate(zip(questions, verdicts), 1):
                 print(f"Q{idx}: {statement}")
                 user = self.get_user_answer()
                 
-                # Format input for facebook/bart-large-mnli
-                input_text = f"{context} [SEP] {statement}"
-                result = nli(input_text)[0]
                 if result["label"] == "neutral":
                     print("Skipping ambiguous statement.\n")
                     continue